@@ -1,29 +1,43 @@
 """
 Главный модуль запуска FastAPI приложения.
 
-- Загружает переменные окружения из файла .env с помощью load_dotenv().
-- Инициализирует настройки приложения через класс AppSettings.
-- Создаёт все таблицы в базе данных, используя SQLAlchemy metadata.
+- Получает настройки приложения через get_settings() (файл .env читается один раз, объект кэшируется).
+- Предоставляет функцию init_db() для создания всех таблиц в базе данных (SQLAlchemy metadata);
+ вызывается в lifespan приложения при старте сервера, а не при каждой сборке приложения.
+ При остановке сервера lifespan закрывает соединения движка (engine.dispose()).
 - Регистрирует маршруты (routers) для пользователей, тегов, элементов и тестов.
-- Предоставляет функцию get_app() для создания и конфигурации экземпляра FastAPI.
+- Предоставляет функцию get_app() для создания и конфигурации экземпляра FastAPI (lifespan и маршруты).
 - При запуске напрямую (через __main__) загружает настройки и может запускать сервер (код запуска можно дополнить).
 
 Этот модуль служит точкой входа для запуска и конфигурации веб-приложения на FastAPI.
 """
 
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
-from dotenv import load_dotenv
 
-from models import engine, Base
-from routers import user_router, tag_router, item_router, test_router
-from settings import AppSettings
+from src.models import engine, Base
+from src.routers import user_router, tag_router, item_router, test_router
+from src.settings import get_settings
+
+
+
+async def init_db() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_db()
+    yield
+    # Закрываем соединения пула, иначе рабочие потоки aiosqlite не дают процессу завершиться
+    await engine.dispose()
 
 
 def get_app() -> FastAPI:
-    Base.metadata.create_all(engine)
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
     app.include_router(user_router)
     app.include_router(tag_router)
     app.include_router(item_router)
@@ -32,7 +46,6 @@ def get_app() -> FastAPI:
 
 
 if __name__ == "__main__":
-    load_dotenv()
-    app_settings = AppSettings()
+    app_settings = get_settings()
 
     uvicorn.run(get_app(), port=app_settings.port, host=app_settings.host)
\ No newline at end of file
@@ -8,40 +8,55 @@
 - Tag: тег пользователя с уникальным именем в рамках пользователя и связью с элементами.
 - item_tag: вспомогательная таблица для реализации связи многие-ко-многим между Item и Tag.
 
-Также в модуле создаётся движок SQLAlchemy для SQLite и фабрика сессий sync_session.
+Также в модуле создаётся асинхронный движок SQLAlchemy для SQLite (aiosqlite) с пулом соединений
+(соединения переиспользуются между запросами), фабрика асинхронных сессий async_session
+и зависимость get_session, выдающая одну сессию на HTTP-запрос.
+При открытии каждого соединения включаются PRAGMA: WAL-журнал, synchronous=NORMAL,
+увеличенный кэш страниц и проверка внешних ключей.
 
 Использование:
 
 - Модели позволяют работать с базой данных через ORM, управлять пользователями, элементами и тегами.
 - Связи реализованы через relationship и вспомогательную таблицу item_tag.
-- Таблицы создаются автоматически через Base.metadata.create_all(engine).
+- Внешние ключи на users объявлены с ON DELETE CASCADE: удаление пользователя одним DELETE
+ (при включённом PRAGMA foreign_keys) удаляет его элементы и теги.
+- Для фильтрации и сортировки элементов заданы индексы по (user_id, created_at),
+ (status, kind, priority), updated_at и по имени тега.
+- Таблицы создаются при запуске через Base.metadata.create_all (см. main.init_db).
 
 Пример создания сессии:
 
-    session = sync_session()
-    # работа с объектами и commit
+    async with async_session() as session:
+        # работа с объектами и await session.commit()
 
 """
 
+from typing import AsyncIterator
+
 from sqlalchemy import (
-    create_engine,
+    event,
     Column,
     Integer,
     String,
     DateTime,
     ForeignKey,
-    Table, UniqueConstraint,
+    Table, UniqueConstraint, Index,
 )
+from sqlalchemy.dialects.sqlite import DATETIME
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import (
-    relationship, sessionmaker,
-)
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import relationship
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.sql import func
 
 from contains import DB_NAME
 
 Base = declarative_base()
 
+# Время хранится в SQLite без микросекунд — в том же формате, что и server_default CURRENT_TIMESTAMP,
+# иначе строковое сравнение значений из Python и из базы даёт неверный результат
+Timestamp = DateTime().with_variant(DATETIME(truncate_microseconds=True), 'sqlite')
+
 
 class User(Base):
     __tablename__ = 'users'
@@ -50,7 +65,7 @@ class User(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     email = Column(String, unique=True, nullable=False)
     display_name = Column(String, nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
 
     items = relationship('Item', back_populates='user', cascade="all, delete-orphan")
     tags = relationship('Tag', back_populates='user', cascade="all, delete-orphan")
@@ -58,17 +73,22 @@ class User(Base):
 
 class Item(Base):
     __tablename__ = 'items'
-    __table_args__ = {'sqlite_autoincrement': True}
+    __table_args__ = (
+        Index('ix_items_user_created', 'user_id', 'created_at'),
+        Index('ix_items_filter', 'status', 'kind', 'priority'),
+        Index('ix_items_updated', 'updated_at'),
+        {'sqlite_autoincrement': True}
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
     title = Column(String, nullable=False)
     kind = Column(String, nullable=False)
     status = Column(String, nullable=False)
     priority = Column(String, nullable=False)
     notes = Column(String)
-    created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, onupdate=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, onupdate=func.now())
 
     user = relationship('User', back_populates='items')
     tags = relationship('Tag', secondary='item_tag', back_populates='items')
@@ -78,11 +98,12 @@ class Tag(Base):
     __tablename__ = 'tags'
     __table_args__ = (
         UniqueConstraint('user_id', 'name', name='uq_user_tag_name'),
+        Index('ix_tags_name', 'name'),  # для фильтра Tag.name IN (...)
         {'sqlite_autoincrement': True}
     )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
     name = Column(String, nullable=False)
 
     user = relationship('User', back_populates='tags')
@@ -98,7 +119,33 @@ item_tag = Table(
 )
 
 # Пример создания движка и сессии
-engine = create_engine(f'sqlite:///{DB_NAME}')
+engine = create_async_engine(
+    f'sqlite+aiosqlite:///{DB_NAME}',
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=5,
+    max_overflow=10,
+    pool_recycle=3600,
+    pool_pre_ping=True,
+    connect_args={"check_same_thread": False},
+)
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _set_pragmas(dbapi_conn, _):
+    # Выполняется один раз на каждое соединение пула, а не на каждый запрос
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.execute("PRAGMA cache_size=-64000")
+    cur.execute("PRAGMA foreign_keys=ON")
+    cur.close()
+
+
+async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
-sync_session = sessionmaker(engine)
\ No newline at end of file
+async def get_session() -> AsyncIterator[AsyncSession]:
+    # Зависимость FastAPI: одна сессия (и одно соединение из пула) на HTTP-запрос
+    async with async_session() as session:
+        yield session
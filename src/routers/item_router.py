@@ -12,24 +12,30 @@
 
 Особенности:
 
-- Используется SQLAlchemy ORM с жадной загрузкой тегов (joinedload).
+- Используется SQLAlchemy ORM с жадной загрузкой тегов: selectinload для списков
+ (без дублирования строк на связи многие-ко-многим), joinedload для одного элемента.
+ В списках остальные связи запрещены raiseload("*"), чтобы случайная ленивая загрузка
+ при сериализации (N+1) сразу приводила к ошибке.
 - Обработка ошибок с HTTPException (404 при отсутствии, 400 при ошибках создания).
+- Обработчики асинхронные и не блокируют event loop при работе с БД (AsyncSession).
 - Валидация входных данных через Pydantic-схемы.
-- Логика работы с БД делегирована функциям из модуля service.
-- При создании элемента проверяется существование пользователя.
-- При удалении элемента возвращается статус 204 No Content.
+- Логика работы с БД делегирована функциям из модуля service; сессия создаётся одна на запрос
+ (зависимость get_session) и передаётся во все вызовы.
+- При создании элемента существование пользователя проверяется в той же сессии, что и вставка.
+- При удалении элемента возвращается статус 204 No Content, при отсутствии записи — 404.
 
 Данный модуль обеспечивает REST API для управления элементами в приложении.
 """
 
 import sqlalchemy
-from fastapi import APIRouter, HTTPException, Response, status
-from sqlalchemy.orm import joinedload
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload, raiseload
 
-from src.models import Item, User
-from src.schema import ItemBaseSchema, ItemWithTagsSchema, ItemSearchParams
-from src.service import (get_all_models, get_model_by_id, get_models_by_user_id, create_model, delete_model_by_id,
-                         get_filtered_items)
+from src.models import Item, Tag, get_session
+from src.schema import ItemBaseSchema, ItemWithTagsSchema, ItemSearchParams, ItemSearchResultSchema
+from src.service import (get_all_models, get_model_by_id, get_models_by_user_id, create_user_model,
+                         delete_model_by_id, get_filtered_items, ModelNotFoundError, user_exists)
 
 item_router = APIRouter(
     prefix="/items",
@@ -41,16 +47,21 @@ item_router = APIRouter(
     "/",
     response_model=list[ItemWithTagsSchema],
 )
-def get_all_items():
-    return get_all_models(Item, options=[joinedload(Item.tags)])
+async def get_all_items(session: AsyncSession = Depends(get_session)):
+    return await get_all_models(
+        session,
+        Item,
+        options=[selectinload(Item.tags).load_only(Tag.id, Tag.name), raiseload("*")],
+        load_only_cols=[Item.id, Item.title, Item.kind, Item.status, Item.priority, Item.notes],
+    )
 
 
 @item_router.get(
     "/{item_id}",
     response_model=ItemWithTagsSchema,
 )
-def get_item_by_id(item_id: int):
-    item = get_model_by_id(model_id=item_id, model=Item, options=[joinedload(Item.tags)])
+async def get_item_by_id(item_id: int, session: AsyncSession = Depends(get_session)):
+    item = await get_model_by_id(session, model_id=item_id, model=Item, options=[joinedload(Item.tags)])
     if item is None:
         raise HTTPException(status_code=404, detail="Item not found")
     return item
@@ -58,19 +69,22 @@ def get_item_by_id(item_id: int):
 
 @item_router.post(
     "/",
-    response_model=list[ItemWithTagsSchema],
+    response_model=list[ItemSearchResultSchema],
 )
-def search_items(item_search_params: ItemSearchParams):
-    return get_filtered_items(
-        status=item_search_params.status,
-        kind=item_search_params.kind,
-        priority=item_search_params.priority,
+async def search_items(item_search_params: ItemSearchParams, session: AsyncSession = Depends(get_session)):
+    return await get_filtered_items(
+        session,
+        status=item_search_params.status.value if item_search_params.status else None,
+        kind=item_search_params.kind.value if item_search_params.kind else None,
+        priority=item_search_params.priority.value if item_search_params.priority else None,
         tag_names=item_search_params.tag_names,
         title_substring=item_search_params.title_substring,
         created_from=item_search_params.created_from,
         created_to=item_search_params.created_to,
         limit=item_search_params.limit,
         offset=item_search_params.offset,
+        after_created_at=item_search_params.after_created_at,
+        after_id=item_search_params.after_id,
         sort_field=item_search_params.sort_field,
         sort_order=item_search_params.sort_order,
     )
@@ -80,35 +94,35 @@ def search_items(item_search_params: ItemSearchParams):
     "/user/{user_id}",
     response_model=list[ItemWithTagsSchema]
 )
-def get_items_by_user(user_id: int):
-    user = get_model_by_id(model_id=user_id, model=User)
-    if user is None:
-       raise HTTPException(status_code=404, detail="User not found")
-    return get_models_by_user_id(user_id=user_id, model=Item, options=[joinedload(Item.tags)])
+async def get_items_by_user(user_id: int, session: AsyncSession = Depends(get_session)):
+    if not await user_exists(session, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    return await get_models_by_user_id(session, user_id=user_id, model=Item, options=[selectinload(Item.tags), raiseload("*")])
 
 
 @item_router.post(
     "/user/{user_id}",
     response_model=ItemBaseSchema
 )
-def create_item(item: ItemBaseSchema, user_id: int):
-    user = get_model_by_id(model_id=user_id, model=User)
-    if user is None:
-        raise HTTPException(status_code=404, detail="User not found")
+async def create_item(item: ItemBaseSchema, user_id: int, session: AsyncSession = Depends(get_session)):
     try:
-        create_model(model=Item, schema=item, user_id=user_id)
+        await create_user_model(session, model=Item, schema=item, user_id=user_id)
         return item
+    except ModelNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except sqlalchemy.exc.IntegrityError:
         raise HTTPException(status_code=400, detail="Item already exists")
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@item_router.delete("/{id}")
-def delete_item(item_id: int, response: Response):
+@item_router.delete("/{item_id}")
+async def delete_item(item_id: int, response: Response, session: AsyncSession = Depends(get_session)):
     try:
-        delete_model_by_id(model=Item, model_id=item_id)
-        response.status_code = status.HTTP_204_NO_CONTENT
-    except Exception as e:
+        deleted = await delete_model_by_id(session, model=Item, model_id=item_id)
+    except sqlalchemy.exc.SQLAlchemyError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Item not found")
+    response.status_code = status.HTTP_204_NO_CONTENT
 
@@ -20,7 +20,10 @@
 """
 
 import sqlalchemy
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import get_session
 from src.service import create_seed_data
 
 
@@ -30,9 +33,9 @@ test_router = APIRouter(
 )
 
 @test_router.post("/")
-def create_data_for_tests():
+async def create_data_for_tests(session: AsyncSession = Depends(get_session)):
     try:
-        create_seed_data()
+        await create_seed_data(session)
         return "success"
     except sqlalchemy.exc.IntegrityError:
         raise HTTPException(
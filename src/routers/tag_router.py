@@ -8,29 +8,36 @@
 - GET /tags/user/{user_id} — получить все теги пользователя.
 - POST /tags/user/{user_id} — создать новый тег для пользователя.
 - POST /tags/link/tag/{tag_id}/item/{item_id} — связать тег с элементом.
+- POST /tags/link/item/{item_id} — связать с элементом сразу несколько тегов (список id в теле).
 - POST /tags/unlink/tag/{tag_id}/item/{item_id} — удалить связь тега с элементом.
 - DELETE /tags/{tag_id} — удалить тег по ID.
 
 Особенности:
 
-- Используется SQLAlchemy ORM с жадной загрузкой тегов для элементов (joinedload).
+- Используется SQLAlchemy ORM с жадной загрузкой тегов для элементов (selectinload).
 - Обработка ошибок с HTTPException (404 при отсутствии, 400 при ошибках создания или дублирования).
+- Связывание тега с элементом идемпотентно: повторная привязка не считается ошибкой.
+- Обработчики асинхронные и не блокируют event loop при работе с БД (AsyncSession).
 - Валидация входных данных через Pydantic-схемы.
-- Логика работы с БД делегирована функциям из модуля service.
-- При связывании и отвязывании тегов с элементами проверяется существование обеих сущностей.
-- При удалении тега возвращается статус 204 No Content.
+- Логика работы с БД делегирована функциям из модуля service; сессия создаётся одна на запрос
+ (зависимость get_session) и передаётся во все вызовы.
+- При связывании и отвязывании тегов с элементами проверка существования обеих сущностей
+ и изменение связи выполняются в одной сессии.
+- При удалении тега возвращается статус 204 No Content, при отсутствии записи — 404.
 
 Данный модуль обеспечивает REST API для управления тегами и их связями с элементами в приложении.
 """
 
 import sqlalchemy
-from fastapi import APIRouter, HTTPException, Response, status
-from sqlalchemy.orm import joinedload
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
-from src.service import (create_model, delete_model_by_id, get_model_by_id, get_all_models, get_models_by_user_id,
-                         add_tag_to_item, remove_tag_from_item)
+from src.service import (create_user_model, delete_model_by_id, get_model_by_id, get_all_models,
+                         get_models_by_user_id, link_tag_to_item, unlink_tag_from_item, add_tags_to_item,
+                         ModelNotFoundError, user_exists)
 from src.schema import TagBaseSchema, TagWithIdSchema, ItemWithTagsSchema
-from src.models import Tag, User, Item
+from src.models import Tag, get_session
 
 tag_router = APIRouter(
     prefix="/tags",
@@ -42,16 +49,16 @@ tag_router = APIRouter(
     "/",
     response_model=list[TagWithIdSchema]
 )
-def get_all_tags():
-    return get_all_models(Tag)
+async def get_all_tags(session: AsyncSession = Depends(get_session)):
+    return await get_all_models(session, Tag, options=[raiseload("*")], load_only_cols=[Tag.id, Tag.name])
 
 
 @tag_router.get(
     "/{tag_id}",
     response_model=TagWithIdSchema
 )
-def get_tag_by_id(tag_id: int):
-    tag = get_model_by_id(model_id=tag_id, model=Tag)
+async def get_tag_by_id(tag_id: int, session: AsyncSession = Depends(get_session)):
+    tag = await get_model_by_id(session, model_id=tag_id, model=Tag)
     if tag is None:
         raise HTTPException(status_code=404, detail="Tag not found")
     return tag
@@ -61,24 +68,22 @@ def get_tag_by_id(tag_id: int):
     "/user/{user_id}",
     response_model=list[TagWithIdSchema]
 )
-def get_user_tags(user_id: int):
-    user = get_model_by_id(model_id=user_id, model=User)
-    if user is None:
-       raise HTTPException(status_code=404, detail="User not found")
-    return get_models_by_user_id(user_id=user_id, model=Tag)
+async def get_user_tags(user_id: int, session: AsyncSession = Depends(get_session)):
+    if not await user_exists(session, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    return await get_models_by_user_id(session, user_id=user_id, model=Tag)
 
 
 @tag_router.post(
     "/user/{user_id}",
     response_model=TagBaseSchema
 )
-def create_tag(user_id: int, tag: TagBaseSchema):
-    user = get_model_by_id(model_id=user_id, model=User)
-    if user is None:
-        raise HTTPException(status_code=404, detail="User not found")
+async def create_tag(user_id: int, tag: TagBaseSchema, session: AsyncSession = Depends(get_session)):
     try:
-        create_model(model=Tag, schema=tag, user_id=user_id)
+        await create_user_model(session, model=Tag, schema=tag, user_id=user_id)
         return tag
+    except ModelNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except sqlalchemy.exc.IntegrityError:
         raise HTTPException(status_code=400, detail="Tag already exists")
     except Exception as e:
@@ -89,44 +94,45 @@ def create_tag(user_id: int, tag: TagBaseSchema):
     "/link/tag/{tag_id}/item/{item_id}",
     response_model=ItemWithTagsSchema
 )
-def link_tag_item(tag_id: int, item_id: int):
-    tag = get_model_by_id(model_id=tag_id, model=Tag)
-    if tag is None:
-        raise HTTPException(status_code=404, detail="Tag not found")
-
-    item = get_model_by_id(model_id=item_id, model=Item, options=[joinedload(Item.tags)])
-    if item is None:
-        raise HTTPException(status_code=404, detail="Item not found")
-
+async def link_tag_item(tag_id: int, item_id: int, session: AsyncSession = Depends(get_session)):
     try:
-        add_tag_to_item(item=item, tag=tag)
+        return await link_tag_to_item(session, tag_id=tag_id, item_id=item_id)
+    except ModelNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except sqlalchemy.exc.IntegrityError:
+        # Параллельный запрос успел создать ту же связь
         raise HTTPException(status_code=400, detail="Item already exists")
-    return get_model_by_id(model_id=item_id, model=Item, options=[joinedload(Item.tags)])
 
 
 @tag_router.post(
-    "/unlink/tag/{tag_id}/item/{item_id}",
+    "/link/item/{item_id}",
     response_model=ItemWithTagsSchema
 )
-def unlink_tag_item(tag_id: int, item_id: int):
-    tag = get_model_by_id(model_id=tag_id, model=Tag)
-    if tag is None:
-        raise HTTPException(status_code=404, detail="Tag not found")
+async def link_tags_item(item_id: int, tag_ids: list[int], session: AsyncSession = Depends(get_session)):
+    try:
+        return await add_tags_to_item(session, item_id=item_id, tag_ids=tag_ids)
+    except ModelNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
-    item = get_model_by_id(model_id=item_id, model=Item, options=[joinedload(Item.tags)])
-    if item is None:
-        raise HTTPException(status_code=404, detail="Item not found")
 
-    remove_tag_from_item(item=item, tag=tag)
-    return get_model_by_id(model_id=item_id, model=Item, options=[joinedload(Item.tags)])
+@tag_router.post(
+    "/unlink/tag/{tag_id}/item/{item_id}",
+    response_model=ItemWithTagsSchema
+)
+async def unlink_tag_item(tag_id: int, item_id: int, session: AsyncSession = Depends(get_session)):
+    try:
+        return await unlink_tag_from_item(session, tag_id=tag_id, item_id=item_id)
+    except ModelNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 
 
-@tag_router.delete("/{id}")
-def delete_tag(tag_id: int, response: Response):
+@tag_router.delete("/{tag_id}")
+async def delete_tag(tag_id: int, response: Response, session: AsyncSession = Depends(get_session)):
     try:
-        delete_model_by_id(model=Tag, model_id=tag_id)
-        response.status_code = status.HTTP_204_NO_CONTENT
-    except Exception as e:
+        deleted = await delete_model_by_id(session, model=Tag, model_id=tag_id)
+    except sqlalchemy.exc.SQLAlchemyError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Tag not found")
+    response.status_code = status.HTTP_204_NO_CONTENT
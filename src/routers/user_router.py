@@ -14,17 +14,20 @@
 - Обработка ошибок с HTTPException:
   - 404, если пользователь не найден.
   - 400, если пользователь с таким email уже существует или другая ошибка при создании.
+- Обработчики асинхронные и не блокируют event loop при работе с БД (AsyncSession).
 - Валидация входных данных через Pydantic-схему UserBaseSchema.
-- Логика работы с БД делегирована функциям из модуля service.
-- При успешном удалении возвращается статус 204 No Content.
+- Логика работы с БД делегирована функциям из модуля service; сессия создаётся одна на запрос
+ (зависимость get_session) и передаётся во все вызовы.
+- При успешном удалении возвращается статус 204 No Content, при отсутствии записи — 404.
 
 Данный модуль обеспечивает REST API для управления пользователями в приложении.
 """
 
 import sqlalchemy
-from fastapi import APIRouter, Response, status, HTTPException
+from fastapi import APIRouter, Depends, Response, status, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.models import User
+from src.models import User, get_session
 from src.schema import UserBaseSchema, UserWithIdSchema
 from src.service import create_model, delete_model_by_id, get_all_models, get_model_by_id
 
@@ -38,16 +41,16 @@ user_router = APIRouter(
     "/",
     response_model=list[UserWithIdSchema]
 )
-def get_all_users():
-    return get_all_models(User)
+async def get_all_users(session: AsyncSession = Depends(get_session)):
+    return await get_all_models(session, User, load_only_cols=[User.id, User.email, User.display_name])
 
 
 @user_router.get(
     "/{user_id}",
     response_model=UserWithIdSchema
 )
-def get_user_by_id(user_id: int):
-    user = get_model_by_id(model_id=user_id, model=User)
+async def get_user_by_id(user_id: int, session: AsyncSession = Depends(get_session)):
+    user = await get_model_by_id(session, model_id=user_id, model=User)
     if user is None:
        raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -56,9 +59,9 @@ def get_user_by_id(user_id: int):
     "/",
     response_model=UserBaseSchema
 )
-def create_user(user: UserBaseSchema):
+async def create_user(user: UserBaseSchema, session: AsyncSession = Depends(get_session)):
     try:
-        create_model(model=User, schema=user)
+        await create_model(session, model=User, schema=user)
         return user
     except sqlalchemy.exc.IntegrityError:
         raise HTTPException(status_code=400, detail="User already exists")
@@ -66,11 +69,13 @@ def create_user(user: UserBaseSchema):
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@user_router.delete("/{id}")
-def delete_user(user_id: int, response: Response):
+@user_router.delete("/{user_id}")
+async def delete_user(user_id: int, response: Response, session: AsyncSession = Depends(get_session)):
     try:
-        delete_model_by_id(model=User, model_id=user_id)
-        response.status_code = status.HTTP_204_NO_CONTENT
-    except Exception as e:
+        deleted = await delete_model_by_id(session, model=User, model_id=user_id)
+    except sqlalchemy.exc.SQLAlchemyError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    if not deleted:
+        raise HTTPException(status_code=404, detail="User not found")
+    response.status_code = status.HTTP_204_NO_CONTENT
 
@@ -10,7 +10,9 @@
 - IDSchema: схема с полем id для наследования.
 - UserWithIdSchema, TagWithIdSchema, ItemWithIdSchema: расширенные схемы с id.
 - ItemWithTagsSchema: элемент с вложенным списком тегов.
-- ItemSearchParams: параметры для поиска и фильтрации элементов, включая фильтры по статусу, типу, приоритету, тегам, подстроке в заголовке, диапазону дат создания, пагинацию и сортировку.
+- ItemSearchResultSchema: результат поиска — элемент с тегами и created_at (для курсора пагинации).
+- ItemSearchParams: параметры для поиска и фильтрации элементов, включая фильтры по статусу, типу, приоритету, тегам, подстроке в заголовке, диапазону дат создания, пагинацию (offset или курсор after_created_at/after_id — только при
+ сортировке по created_at) и сортировку.
 
 Используются перечисления из модуля enums для строгой типизации полей kind, status, priority, а также для параметров сортировки.
 
@@ -20,7 +22,7 @@
 from datetime import datetime
 from typing import Optional, List
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, model_validator
 
 from enums import ItemKind, ItemStatus, ItemPriority, SortOrder, SortField
 
@@ -54,6 +56,9 @@ class ItemWithIdSchema(IDSchema, ItemBaseSchema):
 class ItemWithTagsSchema(IDSchema, ItemBaseSchema):
     tags: list[TagWithIdSchema]
 
+class ItemSearchResultSchema(ItemWithTagsSchema):
+    created_at: Optional[datetime] = None
+
 class ItemSearchParams(BaseModel):
     status: Optional[ItemStatus] = None
     kind: Optional[ItemKind] = None
@@ -62,7 +67,17 @@ class ItemSearchParams(BaseModel):
     title_substring: Optional[str] = None
     created_from: Optional[datetime] = None
     created_to: Optional[datetime] = None
-    limit: int = 20
-    offset: int = 0
+    limit: int = Field(20, ge=1, le=100)
+    offset: int = Field(0, ge=0)
+    after_created_at: Optional[datetime] = None
+    after_id: Optional[int] = None
     sort_field: SortField = SortField.created_at
     sort_order: SortOrder = SortOrder.desc
+
+    @model_validator(mode="after")
+    def check_cursor(self):
+        if (self.after_created_at is None) != (self.after_id is None):
+            raise ValueError("after_created_at and after_id must be passed together")
+        if self.after_id is not None and self.sort_field != SortField.created_at:
+            raise ValueError("cursor pagination is supported only with sort_field=created_at")
+        return self
@@ -4,22 +4,35 @@
 Функции включают:
 
 - get_model_by_id: получение объекта модели по id с опциональной загрузкой связанных данных.
-- get_all_models: получение всех объектов модели с опциональной загрузкой связанных данных.
-- delete_model_by_id: удаление объекта модели по id.
+- get_all_models: получение всех объектов модели с опциональной загрузкой связанных данных
+ и ограничением набора загружаемых колонок (load_only).
+- delete_model_by_id: удаление объекта модели по id одним DELETE; возвращает число удалённых строк.
 - create_model: создание нового объекта модели из Pydantic-схемы с дополнительными параметрами.
 - get_models_by_user_id: получение объектов модели, связанных с конкретным пользователем.
 - get_filtered_items: получение списка элементов (Item) с фильтрацией по статусу, типу,
  приоритету, тегам, подстроке в заголовке, диапазону дат, пагинацией и сортировкой.
-- add_tag_to_item: добавление связи между элементом и тегом через таблицу ассоциации.
-- remove_tag_from_item: удаление связи между элементом и тегом.
+ Поддерживается keyset-пагинация по паре (created_at, id) последнего элемента страницы
+ (created_at возвращается в результате поиска).
+- user_exists: проверка существования пользователя запросом EXISTS без загрузки строки.
+- create_user_model: создание объекта модели, принадлежащего пользователю, с проверкой
+ существования пользователя.
+- add_tags_to_item: привязка нескольких тегов к элементу одной многострочной вставкой
+ (INSERT ... ON CONFLICT DO NOTHING, операция идемпотентна).
+- link_tag_to_item / unlink_tag_from_item: проверка существования тега и элемента и
+ изменение связи между ними.
 - create_seed_data: заполнение базы начальными данными — пользователями, тегами и элементами с привязкой тегов.
 
 Особенности:
 
-- Используется контекстный менеджер для сессий (sync_session).
+- Функции асинхронные (AsyncSession, aiosqlite) и принимают сессию первым аргументом; в маршрутах она создаётся одна на запрос
+ (зависимость get_session), поэтому все шаги обработки запроса используют одно соединение.
+- При отсутствии связанного объекта функции выбрасывают ModelNotFoundError.
 - Для фильтрации и сортировки применяется SQLAlchemy Core и ORM.
 - В функциях create_model и get_model_by_id используется типизация с generics.
-- Функция get_filtered_items реализует сложную логику фильтрации с join по тегам и пагинацией.
+- Частые выборки по id и по пользователю строятся через lambda_stmt, чтобы не компилировать SQL заново.
+- Функция get_filtered_items реализует сложную логику фильтрации с подзапросом EXISTS по тегам и пагинацией.
+- Результаты get_filtered_items кэшируются (TTLCache) по набору параметров; кэш
+ сбрасывается при любой записи в базу через этот модуль.
 - Seed-данные создают пример пользователей с элементами и тегами для тестирования.
 
 Данный модуль служит репозиторием для удобного и безопасного взаимодействия с базой данных в приложении.
@@ -27,62 +40,113 @@
 
 from datetime import datetime
 
+from cachetools import TTLCache
 from pydantic import BaseModel
 from typing import Type, TypeVar, Optional, Sequence, List
 
-from sqlalchemy import delete, select, and_, desc, asc, insert
-from sqlalchemy.orm import joinedload
+from sqlalchemy import delete, select, and_, desc, asc, insert, tuple_, exists, lambda_stmt, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload, raiseload, load_only, InstrumentedAttribute
 from sqlalchemy.orm.strategy_options import _AbstractLoad
 
-from .models import sync_session, User, Tag, Item, Base, item_tag
-from .schema import UserBaseSchema
+from .models import User, Tag, Item, Base, item_tag
+from .schema import UserBaseSchema, ItemSearchResultSchema
 from .enums import SortField, SortOrder, ItemKind, ItemStatus, ItemPriority
 
 T = TypeVar("T", bound=Base)
 
-def get_model_by_id(model_id, model: T, options: Optional[List[_AbstractLoad]] = None) -> Optional[T]:
-    with sync_session() as session:
-        stmt = select(model).where(model.id == model_id)
-        if options:
-            stmt = stmt.options(*options)
-        result = session.scalars(stmt).unique()
-        return result.first()
+# Соответствие параметров сортировки колонкам и направлениям, строится один раз при импорте
+_SORT_COL = {SortField.created_at: Item.created_at, SortField.updated_at: Item.updated_at}
+_ORDER_FN = {SortOrder.asc: asc, SortOrder.desc: desc}
 
+# Кэш результатов поиска элементов. Версия входит в ключ и увеличивается при любой записи,
+# поэтому устаревшие результаты больше не читаются. Обращения к кэшу не содержат await,
+# поэтому в рамках одного event loop блокировка не нужна.
+_search_cache = TTLCache(maxsize=256, ttl=30)
+_search_cache_version = 0
 
-def get_all_models(model: T, options: Optional[List[_AbstractLoad]] = None) -> Sequence[T]:
-    with sync_session() as session:
-        stmt = select(model)
-        if options:
-            stmt = stmt.options(*options)
-        result = session.scalars(stmt).unique()
-        return result.fetchall()
 
+def _invalidate_search_cache() -> None:
+    global _search_cache_version
+    _search_cache_version += 1
 
-def delete_model_by_id(model_id: int, model: Type[Base]):
-    with sync_session() as session:
-        session.execute(delete(model).where(model.id == model_id))
-        session.commit()
 
-def create_model(model: Type[Base], schema: BaseModel, **kwargs):
-    with sync_session() as session:
-        session.add(model(**schema.model_dump(), **kwargs))
-        session.commit()
+class ModelNotFoundError(Exception):
+    """Связанный объект (пользователь, тег, элемент) не найден в базе."""
 
 
-def get_models_by_user_id(
+async def get_model_by_id(
+    session: AsyncSession,
+    model_id,
+    model: T,
+    options: Optional[List[_AbstractLoad]] = None
+) -> Optional[T]:
+    # lambda_stmt кэширует скомпилированный SQL, model_id передаётся как параметр
+    stmt = lambda_stmt(lambda: select(model).where(model.id == model_id))
+    if options:
+        stmt += lambda s: s.options(*options)
+    result = (await session.scalars(stmt)).unique()
+    return result.first()
+
+
+async def get_all_models(
+    session: AsyncSession,
+    model: T,
+    options: Optional[List[_AbstractLoad]] = None,
+    load_only_cols: Optional[List[InstrumentedAttribute]] = None
+) -> Sequence[T]:
+    stmt = lambda_stmt(lambda: select(model))
+    if load_only_cols:
+        options = [load_only(*load_only_cols), *(options or [])]
+    if options:
+        stmt += lambda s: s.options(*options)
+    result = await session.scalars(stmt)
+    return result.fetchall()
+
+
+async def delete_model_by_id(session: AsyncSession, model_id: int, model: Type[Base]) -> int:
+    result = await session.execute(delete(model).where(model.id == model_id))
+    rowcount = result.rowcount
+    await session.commit()
+    if rowcount:
+        _invalidate_search_cache()
+    return rowcount
+
+async def create_model(session: AsyncSession, model: Type[Base], schema: BaseModel, **kwargs):
+    session.add(model(**schema.model_dump(), **kwargs))
+    await session.commit()
+    _invalidate_search_cache()
+
+
+async def user_exists(session: AsyncSession, user_id: int) -> bool:
+    # EXISTS вместо загрузки всей строки пользователя
+    return (await session.execute(select(exists().where(User.id == user_id)))).scalar()
+
+
+async def create_user_model(session: AsyncSession, model: Type[Base], schema: BaseModel, user_id: int):
+    if not await user_exists(session, user_id):
+        raise ModelNotFoundError("User not found")
+    session.add(model(**schema.model_dump(), user_id=user_id))
+    await session.commit()
+    _invalidate_search_cache()
+
+
+async def get_models_by_user_id(
+    session: AsyncSession,
     user_id: int,
     model: T,
     options: Optional[List[_AbstractLoad]] = None
 ) -> List[T]:
-    with sync_session() as session:
-        stmt = select(model).where(model.user_id == user_id)
-        if options:
-            stmt = stmt.options(*options)
-        result = session.scalars(stmt).unique()
-        return result.fetchall()
+    stmt = lambda_stmt(lambda: select(model).where(model.user_id == user_id))
+    if options:
+        stmt += lambda s: s.options(*options)
+    result = await session.scalars(stmt)
+    return result.fetchall()
 
 
-def get_filtered_items(
+async def get_filtered_items(
+    session: AsyncSession,
     status: Optional[str] = None,
     kind: Optional[str] = None,
     priority: Optional[str] = None,
@@ -92,128 +156,202 @@ def get_filtered_items(
     created_to: Optional[datetime] = None,
     limit: int = 20,
     offset: int = 0,
-    sort_field: SortField = SortField.created_at,  # created_at | updated_at | priority
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+    sort_field: SortField = SortField.created_at,  # created_at | updated_at
     sort_order: SortOrder = SortOrder.desc  # asc | desc
-) -> List[Item]:
-
-    with sync_session() as session:
-        stmt = select(Item).distinct()
-
-        # Фильтры по простым полям
-        filters = []
-        if status:
-            filters.append(Item.status == status)
-        if kind:
-            filters.append(Item.kind == kind)
-        if priority:
-            filters.append(Item.priority == priority)
-        if title_substring:
-            filters.append(Item.title.ilike(f"%{title_substring}%"))
-        if created_from:
-            filters.append(Item.created_at >= created_from)
-        if created_to:
-            filters.append(Item.created_at <= created_to)
-
-        # Фильтр по тегам (любая из переданных)
-        if tag_names:
-            # Присоединяем таблицу тегов через ассоциацию
-            stmt = stmt.join(Item.tags)
-            filters.append(Tag.name.in_(tag_names))
-
-        if filters:
-            stmt = stmt.where(and_(*filters))
-
-        # Сортировка
-        sort_col_map = {
-            "created_at": Item.created_at,
-            "updated_at": Item.updated_at,
-            "priority": Item.priority
-        }
-        sort_col = sort_col_map.get(sort_field, Item.created_at)
-        if sort_order.lower() == "desc":
-            stmt = stmt.order_by(desc(sort_col))
+) -> List[dict]:
+    key = (
+        _search_cache_version,
+        status, kind, priority,
+        tuple(sorted(set(tag_names or ()))),
+        title_substring, created_from, created_to,
+        limit, offset, after_created_at, after_id,
+        sort_field, sort_order,
+    )
+    cached = _search_cache.get(key)
+    if cached is not None:
+        return cached
+
+    stmt = select(Item)
+
+    # Фильтры по простым полям (строковые значения перечислений)
+    filters = []
+    if status:
+        filters.append(Item.status == status)
+    if kind:
+        filters.append(Item.kind == kind)
+    if priority:
+        filters.append(Item.priority == priority)
+    if title_substring:
+        filters.append(Item.title.ilike(f"%{title_substring}%"))
+    if created_from:
+        filters.append(Item.created_at >= created_from)
+    if created_to:
+        filters.append(Item.created_at <= created_to)
+
+    # Keyset-пагинация: продолжаем после последней увиденной пары (created_at, id)
+    # (курсор допустим только при сортировке по created_at — проверяется в ItemSearchParams).
+    # Значения передаются обычным кортежем, чтобы параметры получили тип колонки created_at
+    # и совпали с форматом хранения.
+    use_keyset = after_created_at is not None and after_id is not None
+    if use_keyset:
+        cursor = tuple_(Item.created_at, Item.id)
+        if sort_order == SortOrder.desc:
+            filters.append(cursor < (after_created_at, after_id))
         else:
-            stmt = stmt.order_by(asc(sort_col))
-
-        # Пагинация
-        stmt = stmt.limit(limit).offset(offset)
-
-        # Чтобы избежать дублирования из-за join с тегами
-        stmt = stmt.options(joinedload(Item.tags))
-
-        result = session.scalars(stmt).unique().all()
-        return result
-
-
-def add_tag_to_item(item: Item, tag: Tag) -> None:
-    with sync_session() as session:
-        session.execute(
-            insert(item_tag).values(item_id=item.id, tag_id=tag.id)
+            filters.append(cursor > (after_created_at, after_id))
+
+    # Фильтр по тегам (любая из переданных)
+    if tag_names:
+        # Коррелированный EXISTS вместо join: строки элементов не дублируются, DISTINCT не нужен
+        filters.append(
+            select(1)
+            .select_from(item_tag.join(Tag, Tag.id == item_tag.c.tag_id))
+            .where(and_(item_tag.c.item_id == Item.id, Tag.name.in_(tag_names)))
+            .exists()
         )
-        session.commit()
 
-
-def remove_tag_from_item(item: Item, tag: Tag) -> None:
-    with sync_session() as session:
-        session.execute(
-            delete(item_tag).where(
-                (item_tag.c.item_id == item.id) & (item_tag.c.tag_id == tag.id)
-            )
-        )
-        session.commit()
-
-
-def create_seed_data():
-    with sync_session() as session:
-        # Создаём пользователей
-        user1 = User(email="alice@example.com", display_name="Alice")
-        user2 = User(email="bob@example.com", display_name="Bob")
-
-        session.add_all([user1, user2])
-        session.commit()  # чтобы получить id пользователей
-
-        # Создаём теги для пользователей
-        tag1 = Tag(user_id=user1.id, name="urgent")
-        tag2 = Tag(user_id=user1.id, name="work")
-        tag3 = Tag(user_id=user2.id, name="personal")
-
-        session.add_all([tag1, tag2, tag3])
-        session.commit()
-
-        # Создаём items для пользователей
-        item1 = Item(
-            user_id=user1.id,
-            title="Finish report",
-            kind=ItemKind.book,
-            status=ItemStatus.reading,
-            priority=ItemPriority.high,
-            notes="Due next week",
-            created_at=datetime.utcnow()
+    if filters:
+        stmt = stmt.where(and_(*filters))
+
+    # Сортировка
+    order_fn = _ORDER_FN[sort_order]
+    stmt = stmt.order_by(order_fn(_SORT_COL.get(sort_field, Item.created_at)), order_fn(Item.id))
+
+    # Пагинация: offset используется только без курсора
+    stmt = stmt.limit(limit)
+    if not use_keyset:
+        stmt = stmt.offset(offset)
+
+    # Теги подгружаются отдельным запросом IN (...), без дублирования строк;
+    # прочие связи запрещены, чтобы не допустить N+1 при сериализации
+    stmt = stmt.options(selectinload(Item.tags), raiseload("*"))
+
+    # В кэше храним простые словари, чтобы не зависеть от сессии запроса
+    result = [
+        ItemSearchResultSchema.model_validate(item, from_attributes=True).model_dump()
+        for item in (await session.scalars(stmt)).all()
+    ]
+
+    _search_cache[key] = result
+    return result
+
+
+async def add_tags_to_item(session: AsyncSession, item_id: int, tag_ids: List[int]) -> Item:
+    unique_tag_ids = set(tag_ids)
+    found = await session.scalar(select(func.count()).select_from(Tag).where(Tag.id.in_(unique_tag_ids)))
+    if found != len(unique_tag_ids):
+        raise ModelNotFoundError("Tag not found")
+    if not await session.scalar(select(exists().where(Item.id == item_id))):
+        raise ModelNotFoundError("Item not found")
+
+    if unique_tag_ids:
+        # Все связи одной многострочной вставкой; ON CONFLICT DO NOTHING пропускает уже существующие
+        await session.execute(
+            sqlite_insert(item_tag)
+            .values([{"item_id": item_id, "tag_id": tag_id} for tag_id in unique_tag_ids])
+            .on_conflict_do_nothing()
         )
-        item2 = Item(
-            user_id=user1.id,
-            title="Buy groceries",
-            kind=ItemKind.book,
-            status=ItemStatus.reading,
-            priority=ItemPriority.high,
-            notes="Milk, Bread, Eggs",
-            created_at=datetime.utcnow()
-        )
-        item3 = Item(
-            user_id=user2.id,
-            title="Call mom",
-            kind=ItemKind.book,
-            status=ItemStatus.reading,
-            priority=ItemPriority.high,
-            notes="Sunday evening",
-            created_at=datetime.utcnow()
-        )
-
-        # Привязываем теги к items
-        item1.tags.append(tag1)  # urgent
-        item1.tags.append(tag2)  # work
-        item2.tags.append(tag2)  # work
-        item3.tags.append(tag3)  # personal
-
-        session.add_all([item1, item2, item3])
-        session.commit()
\ No newline at end of file
+        await session.commit()
+        _invalidate_search_cache()
+
+    item_stmt = select(Item).where(Item.id == item_id).options(selectinload(Item.tags))
+    return (await session.execute(item_stmt)).scalar_one()
+
+
+async def _get_tag_and_item(session: AsyncSession, tag_id: int, item_id: int):
+    tag = await session.get(Tag, tag_id)
+    if tag is None:
+        raise ModelNotFoundError("Tag not found")
+
+    item_stmt = select(Item).where(Item.id == item_id).options(selectinload(Item.tags))
+    item = (await session.execute(item_stmt)).scalar_one_or_none()
+    if item is None:
+        raise ModelNotFoundError("Item not found")
+    return tag, item
+
+
+async def link_tag_to_item(session: AsyncSession, tag_id: int, item_id: int) -> Item:
+    tag, item = await _get_tag_and_item(session, tag_id, item_id)
+    # Повторная привязка — не ошибка: теги элемента уже загружены, лишний INSERT не нужен
+    if tag not in item.tags:
+        item.tags.append(tag)
+        await session.commit()
+        _invalidate_search_cache()
+    return item
+
+
+async def unlink_tag_from_item(session: AsyncSession, tag_id: int, item_id: int) -> Item:
+    tag, item = await _get_tag_and_item(session, tag_id, item_id)
+    if tag in item.tags:
+        item.tags.remove(tag)
+        await session.commit()
+        _invalidate_search_cache()
+    return item
+
+
+async def create_seed_data(session: AsyncSession):
+    now = datetime.utcnow()
+
+    # Создаём пользователей
+    user1 = User(email="alice@example.com", display_name="Alice")
+    user2 = User(email="bob@example.com", display_name="Bob")
+
+    session.add_all([user1, user2])
+    await session.flush()  # чтобы получить id пользователей
+
+    # Создаём теги для пользователей
+    tag1 = Tag(user_id=user1.id, name="urgent")
+    tag2 = Tag(user_id=user1.id, name="work")
+    tag3 = Tag(user_id=user2.id, name="personal")
+
+    session.add_all([tag1, tag2, tag3])
+
+    # Создаём items для пользователей
+    item1 = Item(
+        user_id=user1.id,
+        title="Finish report",
+        kind=ItemKind.book,
+        status=ItemStatus.reading,
+        priority=ItemPriority.high,
+        notes="Due next week",
+        created_at=now
+    )
+    item2 = Item(
+        user_id=user1.id,
+        title="Buy groceries",
+        kind=ItemKind.book,
+        status=ItemStatus.reading,
+        priority=ItemPriority.high,
+        notes="Milk, Bread, Eggs",
+        created_at=now
+    )
+    item3 = Item(
+        user_id=user2.id,
+        title="Call mom",
+        kind=ItemKind.book,
+        status=ItemStatus.reading,
+        priority=ItemPriority.high,
+        notes="Sunday evening",
+        created_at=now
+    )
+
+    session.add_all([item1, item2, item3])
+    await session.flush()  # чтобы получить id тегов и items
+
+    # Привязываем теги к items одной пакетной вставкой
+    await session.execute(
+        insert(item_tag),
+        [
+            {"item_id": item.id, "tag_id": tag.id}
+            for item, tag in [
+                (item1, tag1),  # urgent
+                (item1, tag2),  # work
+                (item2, tag2),  # work
+                (item3, tag3),  # personal
+            ]
+        ]
+    )
+    await session.commit()
+    _invalidate_search_cache()
@@ -8,12 +8,17 @@
 
 Класс автоматически загружает значения из переменных окружения, что упрощает управление конфигурацией.
 
+Функция get_settings() загружает файл .env и создаёт AppSettings один раз;
+повторные вызовы возвращают закэшированный объект.
+
 Для расширенной настройки можно использовать атрибут model_config
  с указанием файла .env или префиксов переменных окружения.
 """
 
-from pydantic_settings import BaseSettings
+from functools import lru_cache
 
+from dotenv import load_dotenv
+from pydantic_settings import BaseSettings
 
 
 class AppSettings(BaseSettings):
@@ -21,3 +26,7 @@ class AppSettings(BaseSettings):
     host: str = "127.0.0.1"
 
 
+@lru_cache
+def get_settings() -> AppSettings:
+    load_dotenv()
+    return AppSettings()